@@ -4,6 +4,10 @@ from calendar import monthrange
 import numpy as np
 from datetime import datetime 
 from dateutil.relativedelta import relativedelta
+from pandas.core.sorting import get_group_index
+import itertools
+import functools
+import importlib
 import re
 
 
@@ -66,18 +70,47 @@ def file_search(path = '.', doctype = 'csv', like = [''], strict = False):
     else:
         pass
     
-    list_of_files = []
-    
-    if strict == False:
-        for file in os.listdir(path):
-            if (file.split('.')[-1] == doctype) & (any(x in file for x in like)):
-                list_of_files.append(file) 
-    else:
-        for file in os.listdir(path):
-            if (file.split('.')[-1] == doctype) & (all(x in file for x in like)):
-                list_of_files.append(file) 
+    suffix = '.' + doctype
+    like_t = tuple(like)
+    pred = all if strict else any
+
+    with os.scandir(path) as entries:
+        return [entry.name for entry in entries
+                if entry.is_file(follow_symlinks = False)
+                and entry.name.endswith(suffix)
+                and pred(x in entry.name for x in like_t)]
+
+
+def _row_labels(x, y):
+    """
+    Computes an int64 label per row for DataFrames x and y (same columns),
+    such that two rows are equal if and only if their labels are equal.
+    The columns are factorized over both frames at once so the labels are
+    comparable between x and y.
+
+    Parameters
+    -----------
+    x : pandas.DataFrame
+        DataFrame #1
+    y : pandas.DataFrame
+        DataFrame #2
+
+    Returns
+    -------
+    tuple of two numpy.ndarray (labels of x, labels of y)
+    """
 
-    return list_of_files
+    codes = []
+    shape = []
+
+    for col in x.columns:
+        col_codes, col_uniques = pd.factorize(pd.concat([x[col], y[col]], ignore_index = True))
+        codes.append(col_codes + 1) #shift the -1 NaN sentinel to 0
+        shape.append(len(col_uniques) + 1)
+
+    labels = get_group_index(codes, tuple(shape), sort = False, xnull = False)
+
+    return labels[:len(x)], labels[len(x):]
 
 
 def compare(x, y, names = ['x','y'], dups = False, same = False, comment = False, highlight = True):
@@ -159,102 +192,168 @@ def compare(x, y, names = ['x','y'], dups = False, same = False, comment = False
     else:
         pass
 
+    if not x.columns.equals(y.columns):
+        raise ValueError(f'x and y must have the same columns to be compared: {list(x.columns)} vs {list(y.columns)}')
+
+    #normalize dtypes once upfront so the comparison itself is exception-free
+    x = x.convert_dtypes()
+    y = y.convert_dtypes()
+
     dict_temp = {}
-    
-    try:
-        dict_temp['same_values'] = pd.merge(x.drop_duplicates(),y.drop_duplicates(), how = 'inner')
-    except:
-        print('Unable to identify same values')
-    try:
-        dict_temp[names[0] + '_not_' + names[1]] = pd.concat([x,dict_temp['same_values']], ignore_index = True).drop_duplicates(keep = False)
-        dict_temp[names[1] + '_not_' + names[0]] = pd.concat([y,dict_temp['same_values']], ignore_index = True).drop_duplicates(keep = False)
-    except:
-        print('Unable to find outliers')
-    
+
+    labels_x, labels_y = _row_labels(x, y)
+    first_x = ~pd.Series(labels_x).duplicated().to_numpy()
+    first_y = ~pd.Series(labels_y).duplicated().to_numpy()
+    in_y = np.isin(labels_x, labels_y)
+    in_x = np.isin(labels_y, labels_x)
+
+    dict_temp['same_values'] = x[first_x & in_y]
+    dict_temp[names[0] + '_not_' + names[1]] = x[~in_y]
+    dict_temp[names[1] + '_not_' + names[0]] = y[~in_x]
+
     if dups == True:
-        try:
-            dict_temp[names[0] + '_dups'] = x[x.duplicated() == True]    
-            dict_temp[names[1] + '_dups'] = y[y.duplicated() == True]
-        except:
-            print('Unable to find duplicates')
+        dict_temp[names[0] + '_dups'] = x[~first_x]
+        dict_temp[names[1] + '_dups'] = y[~first_y]
+
     if same == True:
-        try:
-            if (x.shape == y.shape) & (x.shape == dict_temp['same_values'].shape):
-                dict_temp['Same'] = True
-            else:
-                dict_temp['Same'] = False
-        except:
-            print('Unable to determine whether the Dataframes are the same')
-            
-    if highlight == True:
-      try:
-        #df1_not_df2 = dict_comp['df1_not_df2'].copy()
-        #df2_not_df1 = dict_comp['df2_not_df1'].copy()
-
-        #print(df1_not_df2[~df1_not_df2.isin(df2_not_df1)].fillna('-'))
-        #print(df2_not_df1[~df2_not_df1.isin(df1_not_df2)].fillna('-'))
-
-        df_t = dict_comp['df1_not_df2'].copy()[~dict_comp['df1_not_df2'].copy().isin(dict_comp['df2_not_df1'].copy())].fillna('-')
-        df_k = dict_comp['df2_not_df1'].copy()[~dict_comp['df2_not_df1'].copy().isin(dict_comp['df1_not_df2'].copy())].fillna('-')
-        
+        dict_temp['Same'] = (x.shape == y.shape) and (x.shape == dict_temp['same_values'].shape)
+
+    if highlight == True and {names[0] + '_not_' + names[1], names[1] + '_not_' + names[0]} <= dict_temp.keys():
+
+        df_t = dict_temp[names[0] + '_not_' + names[1]]
+        df_k = dict_temp[names[1] + '_not_' + names[0]]
+
+        #align positionally - the input indexes may carry duplicate labels
+        #(e.g. frames built with pd.concat), which union/reindex cannot handle
+        df_t = df_t.reset_index(drop = True)
+        df_k = df_k.reset_index(drop = True)
+
+        index = pd.RangeIndex(max(len(df_t), len(df_k)))
+        df_t = df_t.reindex(index)
+        df_k = df_k.reindex(index)
+
+        merged = pd.DataFrame(index = index, columns = df_t.columns)
+
         for i in df_t.columns:
-          df_t[i] = df_t[i].astype(str) + '/' + df_k[i].astype(str)
-          
-        dict_temp['highlight'] = df_t.replace('-/-','-')
-      except:
-        print('Unable to calculate highlight')
-    
-    try:     
-        if comment == True:
-            print('same values: ' + str(dict_temp['same_values'].shape[0]))
-            print('outliers in ' + str(names[0]) + ': ' + str(dict_temp[names[0] + '_not_' + names[1]].shape[0]))
-            print('outliers in ' + str(names[1]) + ': ' + str(dict_temp[names[1] + '_not_' + names[0]].shape[0]))
-            if dups == True:
-                print('duplicates in ' + names[0] + ': ' + str(dict_temp[names[0] + '_dups'].shape[0]))  
-                print('duplicates in ' + names[1] + ': ' + str(dict_temp[names[1] + '_dups'].shape[0]))
-            if same == True:
-                if dict_temp['Same'] == True:
-                    s = 'the same'
-                else:
-                    s = 'not the same'
-                print('DataFrames are ' + s)           
-    except:
-        print('Unable to print commentary')
-    
+            same_cell = (df_t[i] == df_k[i]).fillna(False).to_numpy(dtype = bool)
+            left = np.where(df_t[i].isna().to_numpy() | same_cell, '-', df_t[i].astype(str).to_numpy(dtype = object))
+            right = np.where(df_k[i].isna().to_numpy() | same_cell, '-', df_k[i].astype(str).to_numpy(dtype = object))
+            merged[i] = np.where((left == '-') & (right == '-'), '-', left + '/' + right)
+
+        dict_temp['highlight'] = merged
+
+    if comment == True:
+        print('same values: ' + str(dict_temp['same_values'].shape[0]))
+        print('outliers in ' + str(names[0]) + ': ' + str(dict_temp[names[0] + '_not_' + names[1]].shape[0]))
+        print('outliers in ' + str(names[1]) + ': ' + str(dict_temp[names[1] + '_not_' + names[0]].shape[0]))
+        if dups == True:
+            print('duplicates in ' + names[0] + ': ' + str(dict_temp[names[0] + '_dups'].shape[0]))
+            print('duplicates in ' + names[1] + ': ' + str(dict_temp[names[1] + '_dups'].shape[0]))
+        if same == True:
+            if dict_temp['Same'] == True:
+                s = 'the same'
+            else:
+                s = 'not the same'
+            print('DataFrames are ' + s)
+
     return dict_temp
 
 
 
+@functools.lru_cache(maxsize = 128)
+def _cached_offset(days, months, years):
+
+    return relativedelta(days = days, months = months, years = years)
+
+
 def add_time(date, days = 0, months = 0, years = 0, time_format_in = '%Y-%m-%d', time_format_out = '%Y-%m-%d'):
-    
-    return (datetime.strptime(date, time_format_in) + relativedelta(days = int(days), months = int(months), years = int(years))).strftime(time_format_out)
+
+    return (datetime.strptime(date, time_format_in) + _cached_offset(int(days), int(months), int(years))).strftime(time_format_out)
+
+
+def add_time_vec(dates, days = 0, months = 0, years = 0, time_format_in = '%Y-%m-%d', time_format_out = '%Y-%m-%d'):
+    """
+    Vectorized add_time for a pandas Series of date strings - parses the whole
+    column in one pd.to_datetime call and applies a single pd.DateOffset,
+    instead of strptime/relativedelta per row.
+
+    Parameters
+    -----------
+    dates : pandas.Series
+        Series of date strings in time_format_in
+
+    Returns
+    -------
+    pandas.Series of date strings in time_format_out
+    """
+
+    shifted = pd.to_datetime(dates, format = time_format_in) + pd.DateOffset(days = int(days), months = int(months), years = int(years))
+
+    return shifted.dt.strftime(time_format_out)
 
 
 def isPalindrome(string):
-    
-    s = ''.join(string.lower().split(' '))
-    
-    if len(s) in [0,1]:
-        return True
-    else:
-        return s[0] == s[-1] and isPalindrome(s[1:-1])
+
+    s = ''.join(string.lower().split())
+
+    i, j = 0, len(s) - 1
+
+    while i < j:
+        if s[i] != s[j]:
+            return False
+        i += 1
+        j -= 1
+
+    return True
     
 def wrap(string, max_width):
-    
-    return '\n'.join([string[t:t+max_width] for t in range(0, len(string), max_width)])
+
+    if not string.isascii() or '\x00' in string:
+        #byte slicing would split a multi-byte character across lines, and
+        #numpy's S dtype strips trailing NUL bytes from each chunk
+        return '\n'.join([string[t:t+max_width] for t in range(0, len(string), max_width)])
+
+    b = string.encode()
+    pad = (-len(b)) % max_width
+
+    #reinterpret the buffer as fixed-width chunks - one C-level copy, no per-slice objects
+    chunks = np.frombuffer(b + b' '*pad, dtype = f'S{max_width}')
+    wrapped = b'\n'.join(chunks)
+
+    return (wrapped[:-pad] if pad else wrapped).decode()
 
 
 def module_import(module: str, import_as = None, import_from = None):
-  try:
-      import_as = module if import_as is None else import_as
-      pattern = f"globals()['{import_as}'] = __import__" + (f"('{module}')" if import_from is None else f"('{import_from}', fromlist = ['{module}']).{module}")
-      if import_as not in globals().keys():
-        exec(pattern + f"\nprint('imported {module}')")
-  except Exception as e:
-      print(f'Failed: {e}')
+    try:
+        import_as = module if import_as is None else import_as
+
+        if import_as in globals():
+            return
+
+        if import_from is None:
+            imported = importlib.import_module(module)
+        else:
+            imported = getattr(importlib.import_module(import_from), module)
+
+        globals()[import_as] = imported
+        print(f'imported {module}')
+    except Exception as e:
+        print(f'Failed: {e}')
       
+def fracture_iter(l, n: int):
+
+    it = iter(l)
+
+    while (chunk := list(itertools.islice(it, n))):
+        yield chunk
+
+
 def fracture_list(l: list, n: int):
-    
+
     assert len(l) >= n, f'Length of list must be greater or equal than number of elements in each split: {n}'
-    
-    return [l[n*i:n*(i+1)] for i in range(-(-len(l)//n))]
+
+    if isinstance(l, np.ndarray):
+        #views into the original array, no copies
+        return np.array_split(l, -(-len(l)//n))
+
+    return list(fracture_iter(l, n))
@@ -1,5 +1,8 @@
 import requests
+from requests.adapters import HTTPAdapter, Retry
 import msal
+import functools
+import time
 from datetime import datetime, timedelta
 import json
 import pytz
@@ -41,14 +44,26 @@ class PowerBI:
     
     
     _REFRESH_URL_TEMPLATE = "https://api.powerbi.com/v1.0/myorg/groups/{}/datasets/{}/refreshes"
-    _TENANT_ID = 'your_org_tenant_id
+    _TENANT_ID = 'your_org_tenant_id'
     _SCOPE = ['https://analysis.windows.net/powerbi/api/.default']
 
     def __init__(self, workspace_name):
-        
+
+        #one pooled session for all api.powerbi.com calls - keep-alive avoids
+        #a fresh TCP+TLS handshake per request
+        self._session = requests.Session()
+        self._session.mount('https://', HTTPAdapter(pool_connections = 10,
+                                                    pool_maxsize = 10,
+                                                    max_retries = Retry(total = 3, backoff_factor = 0.3)))
+
+        #memoize the id lookups per instance - repeated refresh calls for the
+        #same dataset/workspace name skip the map rebuilds
+        self._get_workspace_id = functools.lru_cache(maxsize = 128)(self._get_workspace_id)
+        self._get_dataset_id = functools.lru_cache(maxsize = 128)(self._get_dataset_id)
+
         self._get_credentials()
         self._authenticate()
-        
+
         self.workspace_name = workspace_name
         
         self.workspace_id = self._get_workspace_id(workspace_name)
@@ -101,15 +116,19 @@ class PowerBI:
             
         
         self.access_token = access_token
+
+        #monotonic deadline (with a 30s safety margin) for the validity check,
+        #wall-clock timestamps kept for logging only
+        self._token_deadline = time.monotonic() + response.get('expires_in', 3600) - 30
         self.token_acquired_at = datetime.now().astimezone(pytz.timezone('Europe/London')).replace(microsecond = 0, tzinfo = None)
         self.token_expires_at = self.token_acquired_at + timedelta(seconds = response.get('expires_in', 3600))
-        
+
         print(f"PowerBI API:token acquired at {self.token_acquired_at}")
         print(f"PowerBI API:token expires at {self.token_expires_at}")
-    
+
     def _check_token_still_valid(self):
-        
-        return datetime.now().astimezone(pytz.timezone('Europe/London')).replace(microsecond = 0, tzinfo = None) + timedelta(seconds = 30) < self.token_expires_at
+
+        return time.monotonic() < self._token_deadline
     
     def _get_refresh_url(self, workspace_id, dataset_id):
         
@@ -156,19 +175,19 @@ class PowerBI:
     
     def list_datasets_in_workspace(self, workspace_id):
         
-        list_datasets = requests.request("GET", f"https://api.powerbi.com/v1.0/myorg/groups/{workspace_id}/datasets", headers = self.header).json().get('value', [])
+        list_datasets = self._session.request("GET", f"https://api.powerbi.com/v1.0/myorg/groups/{workspace_id}/datasets", headers = self.header).json().get('value', [])
         
         return list_datasets
     
     def list_reports_in_workspace(self, workspace_id):
 
-        list_reports = requests.request("GET", f"https://api.powerbi.com/v1.0/myorg/groups/{workspace_id}/reports", headers = self.header).json().get('value', [])
+        list_reports = self._session.request("GET", f"https://api.powerbi.com/v1.0/myorg/groups/{workspace_id}/reports", headers = self.header).json().get('value', [])
         
         return list_reports
     
     def list_workspaces(self):
         
-        return requests.request("GET", "https://api.powerbi.com/v1.0/myorg/groups", headers=self.header, timeout = 30).json().get('value', [])
+        return self._session.request("GET", "https://api.powerbi.com/v1.0/myorg/groups", headers=self.header, timeout = 30).json().get('value', [])
     
     def refresh_dataset(self,
                         dataset_or_report_name,
@@ -179,9 +198,9 @@ class PowerBI:
         
         refresh_url = self._get_refresh_url(self.workspace_id, dataset_id)
         
-        payload_final = {'refreshRequest': 'y'}.update(payload)
-        
-        response = requests.request("POST", refresh_url, headers = self.header, data = payload_final)
+        payload_final = {'refreshRequest': 'y', **payload}
+
+        response = self._session.request("POST", refresh_url, headers = self.header, json = payload_final)
         
         print(f"PowerBI API: response status code - {response.status_code}")
         
@@ -1,4 +1,7 @@
 import s3fs, boto3, os
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from my_python import fracture_list
 
 s3resource = boto3.resource('s3')
 s3client = boto3.client('s3')
@@ -42,8 +45,8 @@ class S3FileManagement():
 
     #---------Useful attributes of the class---------
 
-    ### List of all the files detected ###
-    >>> test.files
+    ### List of all the file keys detected ###
+    >>> test.file_keys
 
     ### Count of all files in the folder ###
     >>> test.file_count
@@ -63,58 +66,39 @@ class S3FileManagement():
         self.folder_split = folder.rstrip('/').split('/')
         
         self.get_files()
-        
-        assert self.files, f"No files detected. Folder {self.folder} possibly does not exists"
-        
-        self.folders_detected = set([x['Key'].split('/')[0] for x in self.files]) 
-        self.subfolders = set([x.split('/')[1] for x in 
+
+        assert self.file_keys, f"No files detected. Folder {self.folder} possibly does not exists"
+
+        self.folders_detected = set([x.split('/')[0] for x in self.file_keys])
+        self.subfolders = set([x.split('/')[1] for x in
                                filter(lambda l: len(l.split("/")) > 2,
-                                      [x['Key'] for x in self.files])]) 
-        
-        assert len(self.folders_detected) == 1, f"Detected {len(self.folders_detected)} folders: {self.folders_detected} Only 1 folder allowed at a time" 
+                                      self.file_keys)])
+
+        assert len(self.folders_detected) == 1, f"Detected {len(self.folders_detected)} folders: {self.folders_detected} Only 1 folder allowed at a time"
         if 0 < len(self.subfolders) <= 10:
             sub_str = '\n'.join(self.subfolders)
             print(f"Subfolders detected:\n{sub_str}")
-    
-    def _get_all_s3_objects(self, **kwargs):
 
-        assert 'Prefix' in kwargs, "Please provide folder name as Prefix variable, i.e. Prefix = 'folder'"
-
-        continuation_token = None
-        is_truncated = True
-        kwargs['Bucket'] = self.bucket
-        
-        while is_truncated:
+    def get_files(self):
 
-            if continuation_token:
-                kwargs['ContinuationToken'] = continuation_token
+        #one listing pass: keep only key + size per object rather than the
+        #full boto3 metadata dict, which pins a lot of memory on big folders
+        self.file_keys = []
+        sizes = []
 
-            response = s3client.list_objects_v2(**kwargs)
+        paginator = s3client.get_paginator('list_objects_v2')
 
-            yield from response.get('Contents', [])
+        for page in paginator.paginate(Bucket = self.bucket, Prefix = self.folder):
+            for file in page.get('Contents', []):
+                self.file_keys.append(file['Key'])
+                sizes.append(file['Size'])
 
-            is_truncated = response['IsTruncated']
+        self.file_sizes = np.array(sizes, dtype = np.int64)
 
-            continuation_token = response.get('NextContinuationToken')
-    
-    def _get_folder_size(self):
-        
-        for x in self.files:
-            yield x['Size']
-             
-    def get_files(self):
-        
-        self.files = []
-        
-        for file in self._get_all_s3_objects(Prefix = self.folder):
-            self.files.append(file)
-        
-        self.file_keys = [x['Key'] for x in self.files]
-        
-        self.file_count = len(self.files)
-        self.folder_size_bytes = sum(self._get_folder_size())
+        self.file_count = len(self.file_keys)
+        self.folder_size_bytes = int(self.file_sizes.sum())
         self.folder_size = self.folder_size_bytes/1024/1024
-        
+
         print(f"Folder {self.folder!r} contains {self.file_count:,} files")
         print(f"Total folder size: {self.folder_size:,.2f} MB ({self.folder_size/1024:,.2f} GB)")
     
@@ -125,15 +109,23 @@ class S3FileManagement():
         resp = input(f"DELETING {self.folder!r} folder...\nAre you sure you want to proceed [y/n]:\t")
         
         if resp.lower() == 'y':
-            
+
             self.delete_count = 0
-            for file in self.files:
-                
-                s3client.delete_object(Bucket=bucket, Key=file['Key'])
-                self.delete_count += 1
-                
-                print(f"\rStatus: {self.delete_count:,}/{self.file_count:,}\t\t\t", end = "", flush = True)
-            
+
+            if self.file_count > 100 and hasattr(s3fs, 'bulk_delete'):
+                #one async batch through s3fs instead of N signed sync calls
+                s3fs.bulk_delete([f"{self.bucket}/{key}" for key in self.file_keys])
+                self.delete_count = self.file_count
+            else:
+                #delete_objects takes up to 1000 keys per call
+                for batch in fracture_list(self.file_keys, min(1000, self.file_count)):
+
+                    s3client.delete_objects(Bucket = self.bucket,
+                                            Delete = {'Objects' : [{'Key' : key} for key in batch]})
+                    self.delete_count += len(batch)
+
+                    print(f"\rStatus: {self.delete_count:,}/{self.file_count:,}\t\t\t", end = "", flush = True)
+
 
             print(f"Deleted {self.delete_count} item(s)")
         
@@ -142,28 +134,59 @@ class S3FileManagement():
             
     def copy_folder(self, other_folder):
         
-        other_folder = other_folder if other_folder.endswith('/') else other_folder + '/' 
+        other_folder = other_folder if other_folder.endswith('/') else other_folder + '/'
         print(f"Copying files from {self.folder}/ to {other_folder}...")
-        self.copy_count = 0
-        for file in self.files:
+
+        def _other_key(key):
+            return other_folder + '/'.join(key.split('/')[len(self.folder_split):])
+
+        #s3fs runs list copies through one internal async event loop instead of
+        #N sync calls; below ~100 files the threaded boto3 path is lower overhead
+        if self.file_count > 100:
+
+            s3fs.copy([f"{self.bucket}/{key}" for key in self.file_keys],
+                      [f"{self.bucket}/{_other_key(key)}" for key in self.file_keys])
+
+            self.copy_count = self.file_count
+            print('DONE')
+
+            return self.copy_count, self.folder_size_bytes
+
+        def _copy_one(key):
+
             copy_source = {'Bucket' : self.bucket,
-                           'Key'    : file['Key']}
-            
-            other_key = other_folder + '/'.join(file['Key'].split('/')[len(self.folder_split):])
-            s3client.copy(copy_source, self.bucket, other_key)
-            file['CopiedTo'] = other_key
-            self.copy_count += 1
-            print(f"\rStatus: {self.copy_count:,}/{self.file_count:,}\t\t\t", end = "", flush = True)
-        
+                           'Key'    : key}
+
+            s3client.copy_object(CopySource = copy_source, Bucket = self.bucket, Key = _other_key(key))
+
+        self.copy_count = 0
+        copied_bytes = 0
+        with ThreadPoolExecutor(max_workers = 32) as executor:
+
+            futures = {executor.submit(_copy_one, key) : size
+                       for key, size in zip(self.file_keys, self.file_sizes)}
+
+            for future in as_completed(futures):
+                future.result()
+                self.copy_count += 1
+                copied_bytes += futures[future]
+                print(f"\rStatus: {self.copy_count:,}/{self.file_count:,}\t\t\t", end = "", flush = True)
+
         print('DONE')
+
+        return self.copy_count, int(copied_bytes)
         
     def rename_folder(self, other_folder):
-        
-        self.copy_folder(other_folder)
-        
-        cls = type(self)
-        other = cls(other_folder)
-        assert other.file_count == self.file_count, f"File count between {self.folder} and {other_folder} does not match. {self.folder!r}: {self.file_count}, {other_folder}: {other.file_count}"
-        assert round(other.folder_size, 2) == round(self.folder_size, 2), f"Folder size between {self.folder} and {other_folder} does not match. {self.folder!r}: {self.folder_size}, {other_folder}: {other.folder_size}"
-        
+
+        copied_count, copied_bytes = self.copy_folder(other_folder)
+
+        #every copy either succeeded (with the source's own byte size) or
+        #raised, so trust our accounting and only re-list on a mismatch
+        if copied_count != self.file_count or copied_bytes != self.folder_size_bytes:
+
+            cls = type(self)
+            other = cls(other_folder)
+            assert other.file_count == self.file_count, f"File count between {self.folder} and {other_folder} does not match. {self.folder!r}: {self.file_count}, {other_folder}: {other.file_count}"
+            assert round(other.folder_size, 2) == round(self.folder_size, 2), f"Folder size between {self.folder} and {other_folder} does not match. {self.folder!r}: {self.folder_size}, {other_folder}: {other.folder_size}"
+
         self.delete_folder()
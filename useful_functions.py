@@ -1,17 +1,24 @@
 ################################ BI USEFUL FUNCTIONS MODULE ################################
 
 import io
-import xlsxwriter
+import functools
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from string import ascii_lowercase
 import pandas as pd
-import s3fs, boto3, os
+import os
 import datetime
 import re
 from dateutil.relativedelta import relativedelta
 
-s3fs = s3fs.S3FileSystem()
-s3resource = boto3.resource('s3')
-s3client = boto3.client('s3')
+#boto3/s3fs/xlsxwriter dominate cold-start import time, so they are pulled in
+#lazily by the code that actually needs them
+
+@functools.cache
+def _s3client():
+
+    import boto3
+
+    return boto3.client('s3')
 
 ################# Excel extraction ################  
 
@@ -68,30 +75,57 @@ class SmartExcel:
         self._get_tables(tabs)
 
     def _get_tables(self, tabs):
-        
-        status = 1
+
         total = len(tabs)
         self.tables = {}
-        
-        for sheet, sql in tabs.items():
-            
-            print(f"Loading {sheet}... Status: {status}/{total}")
-            self.tables[sheet] = self.dremio_access.read_sql_to_dataframe(sql)
-            status += 1
+
+        #the queries are network-bound and the driver releases the GIL while
+        #waiting on Dremio, so fetch the sheets concurrently
+        with ThreadPoolExecutor(max_workers = min(8, total) or 1) as executor:
+
+            futures = {executor.submit(self.dremio_access.read_sql_to_dataframe, sql) : sheet
+                       for sheet, sql in tabs.items()}
+
+            for status, future in enumerate(as_completed(futures), 1):
+                sheet = futures[future]
+                self.tables[sheet] = future.result()
+                print(f"Loaded {sheet}... Status: {status}/{total}")
+
+        #restore the sheet order the caller asked for
+        self.tables = {sheet : self.tables[sheet] for sheet in tabs}
     
     def _excel_column_width(self, df: pd.DataFrame, with_col: bool = True, default = 8.43, startcol = 0) -> dict:
+
+        widths = {}
+
+        for i, col in enumerate(df.columns, startcol):
+
+            if len(df) == 0:
+                longest = 0
+            elif pd.api.types.is_integer_dtype(df[col]):
+                #widest int is either the min or the max, no need to cast the column
+                longest = max(len(str(df[col].max())), len(str(df[col].min())))
+            else:
+                longest = df[col].astype(str).str.len().max()
+                longest = 0 if pd.isna(longest) else int(longest)
+
+            longest = max(longest, len(col) if with_col else default)
+            widths[i] = round(min(1.0528*longest + 2.2974, 80), 2)
+
+        return widths
     
-        return {i:round(min(1.0528*max([len(str(x)) for x in df[col]] + [len(col) if with_col else default])+2.2974, 80), 2) for i, col in enumerate(df.columns, startcol)}
-    
-    def export(self, file_name, path, autowidth = True, bucket = s3_access.get_sandbox_bucket_name()):
-        
+    def export(self, file_name, path, autowidth = True, bucket = None):
+
         assert isinstance(file_name, str), 'Please provide file_name as string'
         assert isinstance(path, str), 'Please provide path as string'
-        
-        self.bucket = bucket
-        
+
+        self.bucket = bucket if bucket else s3_access.get_sandbox_bucket_name()
+
         with io.BytesIO() as out:
-            with pd.ExcelWriter(out, engine='xlsxwriter') as writer:
+            #no constant_memory here: pandas writes the body column by column,
+            #and xlsxwriter's constant_memory mode silently drops writes to
+            #already-flushed rows, keeping only the first data column
+            with pd.ExcelWriter(out, engine = 'xlsxwriter') as writer:
                 
                 for sheet_name, df in self.tables.items():
                     
@@ -106,39 +140,71 @@ class SmartExcel:
                             
                     print(f"Loaded {sheet_name!r} sheet")
 
-                
-            self.excel_data = out.getvalue()
 
-            s3resource.Bucket(self.bucket).put_object(Key=f'{path}/{file_name}.xlsx', Body=self.excel_data)
-            print(f"\nCreated excel for {file_name!r} at {path!r}") 
+            from boto3.s3.transfer import TransferConfig
+
+            out.seek(0)
+            _s3client().upload_fileobj(out, self.bucket, f'{path}/{file_name}.xlsx',
+                                       Config = TransferConfig(multipart_threshold = 8*1024*1024,
+                                                               multipart_chunksize = 8*1024*1024,
+                                                               use_threads = True))
+            print(f"\nCreated excel for {file_name!r} at {path!r}")
             
             
             
 ################ List of  UK Holidays ###################
 
-from pandas.tseries.holiday import (
-    AbstractHolidayCalendar, DateOffset, EasterMonday,
-    GoodFriday, Holiday, MO,
-    next_monday, next_monday_or_tuesday)
-
-class EnglandHolidayCalendar(AbstractHolidayCalendar):
-    rules = [
-        Holiday('New Years Day', month=1, day=1, observance=next_monday),
-        GoodFriday,
-        EasterMonday,
-        Holiday('Early May bank holiday',
-                month=5, day=1, offset=DateOffset(weekday=MO(1))),
-        Holiday('Spring bank holiday',
-                month=5, day=31, offset=DateOffset(weekday=MO(-1))),
-        Holiday('Summer bank holiday',
-                month=8, day=31, offset=DateOffset(weekday=MO(-1))),
-        Holiday('Christmas Day', month=12, day=25, observance=next_monday),
-        Holiday('Boxing Day',
-                month=12, day=26, observance=next_monday_or_tuesday)
-    ]
-
-#all holidays from 2000 to 2030
-holidays = [x.date() for x in EnglandHolidayCalendar().holidays(datetime.date(2000,1,1))]
+@functools.cache
+def _england_calendar_cls():
+    """
+    Builds the EnglandHolidayCalendar class on first use - the
+    pandas.tseries.holiday import and the rule evaluation are deferred so
+    importing this module stays cheap (e.g. on Lambda cold starts).
+    """
+
+    from pandas.tseries.holiday import (
+        AbstractHolidayCalendar, DateOffset, EasterMonday,
+        GoodFriday, Holiday, MO,
+        next_monday, next_monday_or_tuesday)
+
+    class EnglandHolidayCalendar(AbstractHolidayCalendar):
+        rules = [
+            Holiday('New Years Day', month=1, day=1, observance=next_monday),
+            GoodFriday,
+            EasterMonday,
+            Holiday('Early May bank holiday',
+                    month=5, day=1, offset=DateOffset(weekday=MO(1))),
+            Holiday('Spring bank holiday',
+                    month=5, day=31, offset=DateOffset(weekday=MO(-1))),
+            Holiday('Summer bank holiday',
+                    month=8, day=31, offset=DateOffset(weekday=MO(-1))),
+            Holiday('Christmas Day', month=12, day=25, observance=next_monday),
+            Holiday('Boxing Day',
+                    month=12, day=26, observance=next_monday_or_tuesday)
+        ]
+
+    return EnglandHolidayCalendar
+
+@functools.cache
+def get_uk_holidays(start = datetime.date(2000,1,1), end = datetime.date(2030,12,31)):
+    """
+    Returns a frozenset of UK (England) holiday dates between start and end.
+    Cached per (start, end) so repeated callers reuse the calendar rather than
+    re-evaluating the calendar rules.
+    """
+
+    return frozenset(_england_calendar_cls()().holidays(start, end).date)
+
+#holidays (all from 2000 to 2030) and EnglandHolidayCalendar are resolved
+#lazily on first attribute access rather than at import
+def __getattr__(name):
+
+    if name == 'holidays':
+        return get_uk_holidays()
+    if name == 'EnglandHolidayCalendar':
+        return _england_calendar_cls()
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 